@@ -1,4 +1,5 @@
 import random
+from collections import Counter
 
 # Grid size
 GRID_SIZE = 5
@@ -7,8 +8,10 @@ GRID_SIZE = 5
 player_pos = [0, 0]
 ai_pos = [GRID_SIZE - 1, GRID_SIZE - 1]
 
-# Track player moves for AI learning
-player_moves_history = []
+# Track player move counts for AI learning, plus the current favourite
+move_counts = Counter()
+top_move = None
+top_count = 0
 
 # Directions mapping
 directions = {
@@ -18,6 +21,7 @@ directions = {
     "east": (0, 1),
     "hide": (0, 0)
 }
+direction_names = tuple(directions)
 
 def print_grid():
     # Flip rows so row 0 is at the bottom
@@ -42,13 +46,12 @@ def move(pos, direction):
     return new_pos
 
 def ai_move():
-    if not player_moves_history:
+    if top_move is None:
         # Random first move
-        return move(ai_pos, random.choice(list(directions.keys())))
+        return move(ai_pos, random.choice(direction_names))
     
-    # Count most frequent player move
-    move_counts = {dir: player_moves_history.count(dir) for dir in directions}
-    predicted_move = max(move_counts, key=move_counts.get)
+    # Most frequent player move so far
+    predicted_move = top_move
     
     # Predicted player position
     predicted_pos = move(player_pos, predicted_move)
@@ -80,7 +83,12 @@ while True:
         continue
     
     player_pos = move(player_pos, action)
-    player_moves_history.append(action)
+    move_counts[action] += 1
+    count = move_counts[action]
+    # ties go to the direction listed first, as max() over directions did
+    if count > top_count or (count == top_count and
+                             direction_names.index(action) < direction_names.index(top_move)):
+        top_move, top_count = action, count
     
     ai_pos = ai_move()
     
@@ -3,7 +3,9 @@ import curses
 import random
 import json
 import os
-from collections import deque, defaultdict, Counter
+from array import array
+from collections import deque, Counter
+from itertools import chain
 
 # ----------------------
 # CONFIG
@@ -13,7 +15,8 @@ NUM_OBSTACLES = 12
 NUM_TRAPS = 3
 AI_STUN_TURNS = 2
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-MEMORY_FILE = os.path.join(BASE_DIR, "ai_memory.json")
+MEMORY_FILE = os.path.join(BASE_DIR, "ai_memory.bin")
+LEGACY_MEMORY_FILE = os.path.join(BASE_DIR, "ai_memory.json")
 MARKOV_ORDER = 2            # how many recent moves to use for context
 RECENCY_WEIGHT = 2.0        # weight for this game's recent move counts vs. global
 PREDICT_FUZZ = 0.15         # small randomness so AI isn’t perfectly deterministic
@@ -27,107 +30,169 @@ PLAYER= 'P'
 AI    = 'A'
 TRAP  = 'T'
 
-# Directions
-DIRS = {
-    "north": (-1, 0),
-    "south": (1, 0),
-    "west": (0, -1),
-    "east": (0, 1),
+# Directions: every per-direction table shares this index order
+DIR_LIST = ["north", "south", "west", "east"]
+DIR_DELTAS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+DIR_INDEX = {name: i for i, name in enumerate(DIR_LIST)}
+NUM_DIRS = len(DIR_LIST)
+
+DIR_KEYS = {                # curses key -> direction index
+    curses.KEY_UP:    DIR_INDEX["north"],
+    curses.KEY_DOWN:  DIR_INDEX["south"],
+    curses.KEY_LEFT:  DIR_INDEX["west"],
+    curses.KEY_RIGHT: DIR_INDEX["east"],
 }
 
-DIR_KEYS = {                # curses key -> canonical label
-    curses.KEY_UP:    "north",
-    curses.KEY_DOWN:  "south",
-    curses.KEY_LEFT:  "west",
-    curses.KEY_RIGHT: "east",
-}
+# Board layout: one flat bytearray, row-major, padded with a one-cell wall
+# border so neighbour lookups never need a bounds check. Positions are
+# indices into it; (r, c) only comes back out when drawing.
+STRIDE = GRID_SIZE + 2
+EMPTY_B = ord(EMPTY)
+WALL_B = ord(WALL)
+GOAL_B = ord(GOAL)
+PLAYER_B = ord(PLAYER)
+AI_B = ord(AI)
+TRAP_B = ord(TRAP)
+OFFSETS = tuple(dr * STRIDE + dc for dr, dc in DIR_DELTAS)
 
 # ----------------------
-# MEMORY (JSON)
+# MEMORY (append-only log)
 # ----------------------
+# One record per game: a 4-byte little-endian length, then the record as
+# compact JSON. Saving a game appends one record instead of rewriting
+# everything that came before it.
+RECORD_HEADER = 4
+
+def pack_record(record):
+    payload = json.dumps(record, separators=(",", ":")).encode("utf-8")
+    return len(payload).to_bytes(RECORD_HEADER, "little") + payload
+
+def import_legacy_memory(path, legacy_path=LEGACY_MEMORY_FILE):
+    """Seed a new log from the games in the old JSON memory file, if any."""
+    try:
+        with open(legacy_path, "r") as f:
+            games = json.load(f).get("games", [])
+    except Exception:
+        return
+    with open(path, "ab") as f:
+        f.write(b"".join(pack_record(g) for g in games))
+
 def load_memory(path=MEMORY_FILE):
     if not os.path.exists(path):
-        return {"games": []}
+        import_legacy_memory(path)
     try:
-        with open(path, "r") as f:
-            return json.load(f)
-    except Exception:
-        # corrupt or unreadable; start fresh
+        with open(path, "rb") as f:
+            raw = f.read()
+    except OSError:
         return {"games": []}
-
-def save_game(moves, result, path=MEMORY_FILE):
-    data = load_memory(path)
-    data["games"].append({
+    games = []
+    pos = 0
+    while pos + RECORD_HEADER <= len(raw):
+        size = int.from_bytes(raw[pos:pos + RECORD_HEADER], "little")
+        end = pos + RECORD_HEADER + size
+        if end > len(raw):
+            break
+        try:
+            games.append(json.loads(raw[pos + RECORD_HEADER:end]))
+        except ValueError:
+            pass  # corrupt but complete: its header still says where it ends
+        pos = end
+    if pos < len(raw):
+        # Torn tail (e.g. a crash mid-save): cut it off so the next append
+        # lands right after the last whole record instead of behind bytes
+        # that would hide it, and every game after it, forever.
+        try:
+            os.truncate(path, pos)
+        except OSError:
+            pass
+    return {"games": games}
+
+def save_game(memory, moves, result, path=MEMORY_FILE):
+    """Record one game in the already-loaded memory and append it to the log."""
+    record = {
         "moves": moves,          # list of "north"/"south"/...
         "result": result,        # "win" or "loss" or "quit"
         "grid": GRID_SIZE
-    })
-    with open(path, "w") as f:
-        json.dump(data, f, indent=2)
+    }
+    memory["games"].append(record)
+    with open(path, "ab") as f:
+        f.write(pack_record(record))
+
+def context_row(ctx):
+    """
+    Row of the model matrix for a context of move labels: the moves read as
+    base-NUM_DIRS digits behind a leading 1, so contexts of different
+    lengths never share a row.
+    """
+    row = 1
+    for m in ctx:
+        row = row * NUM_DIRS + DIR_INDEX[m]
+    return row
+
+def update_markov_model(model, global_counts, seqs, order=2):
+    """Fold the move sequences of one or more games into a model, in place."""
+    global_counts.update(chain.from_iterable(seqs))
+    # contexts: count every (k+1)-gram of every game in one Counter pass by
+    # zipping k+1 shifted views of each sequence, then fold the (few)
+    # distinct grams into the model
+    for k in range(1, order+1):
+        grams = Counter(chain.from_iterable(
+            zip(*[seq[j:] for j in range(k+1)]) for seq in seqs))
+        for gram, n in grams.items():
+            model[context_row(gram[:-1]) * NUM_DIRS + DIR_INDEX[gram[-1]]] += n
 
 def build_markov_model(memory, order=2):
     """
     Returns:
-      model: dict mapping tuple(context) -> Counter(next_move)
+      model: flat array('i') matrix of next-move counts; row
+             context_row(context), column DIR_INDEX[next_move]
       global_counts: Counter of all moves
     """
-    model = defaultdict(Counter)
+    model = array('i', [0]) * (2 * NUM_DIRS**order * NUM_DIRS)
     global_counts = Counter()
-    for g in memory.get("games", []):
-        seq = g.get("moves", [])
-        global_counts.update(seq)
-        if not seq:
-            continue
-        # contexts
-        for i in range(len(seq)):
-            for k in range(1, order+1):
-                if i - k < 0: break
-                ctx = tuple(seq[i-k:i])
-                model[ctx][seq[i]] += 1
+    seqs = [g.get("moves", []) for g in memory.get("games", [])]
+    update_markov_model(model, global_counts, seqs, order)
     return model, global_counts
 
 # ----------------------
 # GRID + POSITIONS
 # ----------------------
-def random_empty_cell(grid):
-    n = len(grid)
-    while True:
-        r = random.randrange(n)
-        c = random.randrange(n)
-        if grid[r][c] == EMPTY:
-            return [r, c]
+def to_idx(r, c):
+    return (r + 1) * STRIDE + (c + 1)
+
+CELLS = tuple(to_idx(r, c) for r in range(GRID_SIZE) for c in range(GRID_SIZE))
 
 def make_grid():
-    grid = [[EMPTY for _ in range(GRID_SIZE)] for _ in range(GRID_SIZE)]
-    # obstacles
-    placed = 0
-    while placed < NUM_OBSTACLES:
-        r = random.randrange(GRID_SIZE)
-        c = random.randrange(GRID_SIZE)
-        if grid[r][c] == EMPTY:
-            grid[r][c] = WALL
-            placed += 1
+    grid = bytearray([WALL_B]) * (STRIDE * STRIDE)
+    for r in range(GRID_SIZE):
+        row = to_idx(r, 0)
+        grid[row:row + GRID_SIZE] = bytes([EMPTY_B]) * GRID_SIZE
+    # obstacles: distinct cells by construction, no retry loop
+    for idx in random.sample(CELLS, NUM_OBSTACLES):
+        grid[idx] = WALL_B
     return grid
 
 def place_entities(grid):
-    player_pos = random_empty_cell(grid)
-    ai_pos     = random_empty_cell(grid)
-    goal_pos   = random_empty_cell(grid)
-    # Avoid initial overlaps or too-close starts
-    while ai_pos == player_pos or goal_pos == player_pos or goal_pos == ai_pos:
-        ai_pos   = random_empty_cell(grid)
-        goal_pos = random_empty_cell(grid)
+    # one draw of three distinct empty cells, so nothing can overlap
+    empties = [idx for idx in CELLS if grid[idx] == EMPTY_B]
+    player_pos, ai_pos, goal_pos = random.sample(empties, 3)
     return player_pos, ai_pos, goal_pos
 
 # ----------------------
 # PATHFINDING
 # ----------------------
-def neighbors(r, c, grid):
-    n = len(grid)
-    for dr, dc in DIRS.values():
-        nr, nc = r+dr, c+dc
-        if 0 <= nr < n and 0 <= nc < n and grid[nr][nc] != WALL:
-            yield nr, nc
+def neighbors(idx, grid):
+    for off in OFFSETS:
+        nb = idx + off
+        if grid[nb] != WALL_B:
+            yield nb
+
+# Scratch space for bfs_first_step, sized for the padded board and reused by
+# every call: a fixed queue walked with head/tail indices, and the
+# first-step table, reset from a blank copy in a single slice assignment.
+_BFS_QUEUE = array('i', [0]) * (STRIDE * STRIDE)
+_BFS_FIRST = array('i', [-1]) * (STRIDE * STRIDE)
+_BFS_BLANK = array('i', [-1]) * (STRIDE * STRIDE)
 
 def bfs_first_step(start, target, grid):
     """
@@ -136,41 +201,65 @@ def bfs_first_step(start, target, grid):
     """
     if start == target:
         return start
-    q = deque([start])
-    prev = {tuple(start): None}
-    n = len(grid)
+    # first_step[cell]: the move out of start whose branch reached cell
+    # (-1 = not seen yet), so no path needs reconstructing at the end
+    first_step = _BFS_FIRST
+    first_step[:] = _BFS_BLANK
+    first_step[start] = start
+    queue = _BFS_QUEUE
+    queue[0] = start
+    head, tail = 0, 1
+
+    while head < tail:
+        cur = queue[head]
+        head += 1
+        step = first_step[cur]
+        for off in OFFSETS:
+            nb = cur + off
+            if grid[nb] != WALL_B and first_step[nb] == -1:
+                if cur == start:
+                    step = nb
+                if nb == target:
+                    return step
+                first_step[nb] = step
+                queue[tail] = nb
+                tail += 1
+    return None
 
+def bfs_successors(goal, grid):
+    """
+    One BFS outward from goal. Returns an array where next_from[cell] is the
+    next step from cell along a shortest path to goal (goal maps to itself,
+    -1 means unreachable).
+    """
+    next_from = array('i', [-1]) * len(grid)
+    next_from[goal] = goal
+    q = deque([goal])
     while q:
-        r, c = q.popleft()
-        for nr, nc in neighbors(r, c, grid):
-            if (nr, nc) not in prev:
-                prev[(nr, nc)] = (r, c)
-                if [nr, nc] == target:
-                    # reconstruct first move
-                    cur = (nr, nc)
-                    while prev[cur] != tuple(start):
-                        cur = prev[cur]
-                    return [cur[0], cur[1]]
-                q.append((nr, nc))
-    return None
+        cur = q.popleft()
+        for nb in neighbors(cur, grid):
+            if next_from[nb] == -1:
+                next_from[nb] = cur
+                q.append(nb)
+    return next_from
+
+# Walls are fixed once make_grid returns and traps don't block movement,
+# so a BFS answer holds for the rest of the game on that board.
+_BFS_CACHE = {"grid": None, "steps": {}}
+
+def cached_bfs_first_step(start, target, grid):
+    if _BFS_CACHE["grid"] is not grid:
+        _BFS_CACHE["grid"] = grid
+        _BFS_CACHE["steps"] = {}
+    steps = _BFS_CACHE["steps"]
+    key = (start, target)
+    if key not in steps:
+        steps[key] = bfs_first_step(start, target, grid)
+    return steps[key]
 
 # ----------------------
 # AI PREDICTION
 # ----------------------
-def choose_from_counter(counter_dict):
-    """Sample from a Counter-like dict, with probabilities proportional to counts."""
-    items = list(counter_dict.items())
-    if not items:
-        return random.choice(list(DIRS.keys()))
-    total = sum(v for _, v in items)
-    r = random.random() * total
-    acc = 0
-    for k, v in items:
-        acc += v
-        if r <= acc:
-            return k
-    return items[-1][0]
-
 def predict_next_move(this_game_moves, model, global_counts, order=2):
     """
     Predict the player's next move using:
@@ -178,73 +267,86 @@ def predict_next_move(this_game_moves, model, global_counts, order=2):
       - Recent moves in THIS game (recency-weight blending)
       - Small randomness (PREDICT_FUZZ)
     """
-    # Try longest context first
-    combined = Counter()
+    # one score per direction, in DIR_LIST order; start from a tiny fuzz to
+    # avoid zero-probability traps and predictability
+    scores = [PREDICT_FUZZ] * NUM_DIRS
 
-    # recent context from this game
+    # recent context from this game, longest first
     for k in reversed(range(1, order+1)):
         if len(this_game_moves) >= k:
-            ctx = tuple(this_game_moves[-k:])
-            combined.update(model.get(ctx, Counter()))
+            base = context_row(this_game_moves[-k:]) * NUM_DIRS
+            for i in range(NUM_DIRS):
+                scores[i] += model[base + i]
 
     # blend in global counts (weak prior)
     # and this game's recent histogram (stronger)
     game_counts = Counter(this_game_moves[-8:])  # look at last up-to-8 moves
-    for m in DIRS.keys():
-        combined[m] += 0.50 * global_counts.get(m, 0) + RECENCY_WEIGHT * game_counts.get(m, 0)
-
-    # add a tiny fuzz to avoid zero-probability traps and predictability
-    for m in DIRS.keys():
-        combined[m] += PREDICT_FUZZ
+    for i, m in enumerate(DIR_LIST):
+        scores[i] += 0.50 * global_counts.get(m, 0) + RECENCY_WEIGHT * game_counts.get(m, 0)
 
-    return choose_from_counter(combined)
+    return random.choices(DIR_LIST, weights=scores, k=1)[0]
 
 # ----------------------
 # GAME LOOP (CURSES)
 # ----------------------
-def draw(stdscr, grid, player_pos, ai_pos, goal_pos, traps, traps_left, msg, turn):
+HEADER = "AI NEMESIS — reach G, avoid A | arrows: move | t: trap | q: quit"
+
+# Terminal width and the header clipped to it; only recomputed on resize.
+_SCREEN = {"max_x": 0, "header": ""}
+
+def update_screen_size():
+    _SCREEN["max_x"] = curses.COLS - 1
+    _SCREEN["header"] = HEADER[:_SCREEN["max_x"]]
+
+def make_render_buf(grid):
+    """One bytearray per board row, laid out as it is printed ("x x x ...")."""
+    render_buf = []
+    for r in range(GRID_SIZE):
+        row = to_idx(r, 0)
+        render_buf.append(bytearray(b" ".join(grid[i:i + 1] for i in range(row, row + GRID_SIZE))))
+    return render_buf
+
+def paint_cells(render_buf, cells, grid, player_pos, ai_pos, goal_pos, traps):
+    """Repaint just the given cells of render_buf from the current game state."""
+    for idx in cells:
+        if idx == player_pos:
+            ch = PLAYER_B
+        elif idx == ai_pos:
+            ch = AI_B
+        elif idx == goal_pos:
+            ch = GOAL_B
+        elif traps[idx]:
+            ch = TRAP_B
+        else:
+            ch = grid[idx]
+        r, c = divmod(idx, STRIDE)
+        render_buf[r - 1][2 * (c - 1)] = ch
+
+def draw(stdscr, render_buf, traps_left, msg, turn):
     stdscr.clear()
-    n = len(grid)
-    max_x = curses.COLS - 1  # Get terminal width
+    max_x = _SCREEN["max_x"]
     # Header
-    header = "AI NEMESIS — reach G, avoid A | arrows: move | t: trap | q: quit"
-    stdscr.addstr(0, 0, header[:max_x])
+    stdscr.addstr(0, 0, _SCREEN["header"])
     stdscr.addstr(1, 0, f"Traps left: {traps_left}   Turn: {turn}"[:max_x])
-    # Grid
-    for r in range(n):
-        line = []
-        for c in range(n):
-            ch = grid[r][c]
-            if player_pos == [r, c]:
-                ch = PLAYER
-            elif ai_pos == [r, c]:
-                ch = AI
-            elif goal_pos == [r, c]:
-                ch = GOAL
-            elif (r, c) in traps:
-                ch = TRAP
-            line.append(ch)
-        line_str = " ".join(line)
-        stdscr.addstr(3 + r, 0, line_str[:max_x])
+    # Grid, sent to curses as one multi-line string
+    stdscr.addstr(3, 0, "\n".join(row[:max_x].decode() for row in render_buf))
     # Footer
     if msg:
-        stdscr.addstr(3 + n + 1, 0, msg[:max_x])
+        stdscr.addstr(3 + GRID_SIZE + 1, 0, msg[:max_x])
     stdscr.refresh()
 
-def in_bounds(pos):
-    return 0 <= pos[0] < GRID_SIZE and 0 <= pos[1] < GRID_SIZE
-
-def try_move(pos, move_label, grid):
-    dr, dc = DIRS[move_label]
-    nr, nc = pos[0] + dr, pos[1] + dc
-    if 0 <= nr < GRID_SIZE and 0 <= nc < GRID_SIZE and grid[nr][nc] != WALL:
-        return [nr, nc]
+def try_move(pos, move, grid):
+    nxt = pos + OFFSETS[move]
+    if grid[nxt] != WALL_B:
+        return nxt
     return pos
 
 def manhattan(a, b):
-    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+    ar, ac = divmod(a, STRIDE)
+    br, bc = divmod(b, STRIDE)
+    return abs(ar - br) + abs(ac - bc)
 
-def ai_turn(ai_pos, player_pos, grid, traps, this_moves, model, global_counts, stunned, goal_pos=None):
+def ai_turn(ai_pos, player_pos, grid, traps, this_moves, model, global_counts, stunned, next_from):
     """Return new_ai_pos, stunned_left"""
     if stunned > 0:
         return ai_pos, stunned - 1
@@ -254,24 +356,24 @@ def ai_turn(ai_pos, player_pos, grid, traps, this_moves, model, global_counts, s
     if manhattan(ai_pos, player_pos) > CLOSE_RANGE + 2:
         moves = 2
 
+    # Intercept: target the player's shortest path to the goal
+    path_step = next_from[player_pos]
+    if path_step != -1:
+        intercept_target = path_step
+    else:
+        intercept_target = player_pos
+
     new_ai_pos = ai_pos
     stunned_left = 0
     for _ in range(moves):
-        # Intercept: target the player's shortest path to the goal
-        path_step = bfs_first_step(player_pos, goal_pos, grid)
-        if path_step:
-            intercept_target = path_step
-        else:
-            intercept_target = player_pos
-
-        step = bfs_first_step(new_ai_pos, intercept_target, grid)
+        step = cached_bfs_first_step(new_ai_pos, intercept_target, grid)
         if step is None:
             # No path: fallback greedy one-step toward intercept_target
             best = new_ai_pos
             best_d = 10**9
-            for name, (dr, dc) in DIRS.items():
-                cand = [new_ai_pos[0] + dr, new_ai_pos[1] + dc]
-                if in_bounds(cand) and grid[cand[0]][cand[1]] != WALL:
+            for off in OFFSETS:
+                cand = new_ai_pos + off
+                if grid[cand] != WALL_B:
                     d = manhattan(cand, intercept_target)
                     if d < best_d:
                         best_d = d
@@ -279,8 +381,8 @@ def ai_turn(ai_pos, player_pos, grid, traps, this_moves, model, global_counts, s
             step = best
 
         # Trap check
-        if tuple(step) in traps:
-            traps.remove(tuple(step))
+        if traps[step]:
+            traps[step] = 0
             stunned_left = AI_STUN_TURNS
             new_ai_pos = step
             break
@@ -292,42 +394,53 @@ def main(stdscr):
     curses.curs_set(0)
     stdscr.nodelay(False)  # blocking input per turn
     stdscr.keypad(True)
+    update_screen_size()
 
     memory = load_memory()
     model, global_counts = build_markov_model(memory, MARKOV_ORDER)
 
     grid = make_grid()
     player_pos, ai_pos, goal_pos = place_entities(grid)
-    traps = set()
+    next_from = bfs_successors(goal_pos, grid)
+    traps = bytearray(len(grid))   # 1 = trap on that cell
     traps_left = NUM_TRAPS
     this_game_moves = []
     ai_stunned = 0
     msg = ""
     turn = 1
+    # the screen's copy of the board; only cells that change get repainted
+    render_buf = make_render_buf(grid)
+    paint_cells(render_buf, (player_pos, ai_pos, goal_pos), grid, player_pos, ai_pos, goal_pos, traps)
 
     while True:
-        draw(stdscr, grid, player_pos, ai_pos, goal_pos, traps, traps_left, msg, turn)
+        draw(stdscr, render_buf, traps_left, msg, turn)
         msg = ""
 
         # --- Player input ---
         ch = stdscr.getch()
+        if ch == curses.KEY_RESIZE:
+            curses.update_lines_cols()
+            update_screen_size()
+            continue
         if ch == ord('q'):
-            save_game(this_game_moves, "quit")
+            save_game(memory, this_game_moves, "quit")
             return
 
         if ch == ord('t'):
-            if traps_left > 0 and tuple(player_pos) not in traps:
-                traps.add(tuple(player_pos))
+            if traps_left > 0 and not traps[player_pos]:
+                traps[player_pos] = 1
                 traps_left -= 1
                 msg = "Trap placed."
             else:
                 msg = "No traps left or trap already here."
             # No movement this turn if placing trap; AI still moves
         elif ch in DIR_KEYS:
-            move_label = DIR_KEYS[ch]
-            new_pos = try_move(player_pos, move_label, grid)
+            move = DIR_KEYS[ch]
+            new_pos = try_move(player_pos, move, grid)
             if new_pos != player_pos:
-                player_pos = new_pos
+                old_pos, player_pos = player_pos, new_pos
+                paint_cells(render_buf, (old_pos, player_pos), grid, player_pos, ai_pos, goal_pos, traps)
+                move_label = DIR_LIST[move]
                 this_game_moves.append(move_label)
             else:
                 msg = "Blocked."
@@ -336,14 +449,16 @@ def main(stdscr):
 
         # Win check
         if player_pos == goal_pos:
-            draw(stdscr, grid, player_pos, ai_pos, goal_pos, traps, traps_left, "You reached the goal! You win.", turn)
+            draw(stdscr, render_buf, traps_left, "You reached the goal! You win.", turn)
             curses.napms(900)
-            save_game(this_game_moves, "win")
+            save_game(memory, this_game_moves, "win")
             return
 
         # --- AI move ---
         
-        ai_pos, stunned_new = ai_turn(ai_pos, player_pos, grid, traps, this_game_moves, model, global_counts, ai_stunned, goal_pos)
+        old_pos = ai_pos
+        ai_pos, stunned_new = ai_turn(ai_pos, player_pos, grid, traps, this_game_moves, model, global_counts, ai_stunned, next_from)
+        paint_cells(render_buf, (old_pos, ai_pos), grid, player_pos, ai_pos, goal_pos, traps)
 
         if stunned_new > 0:
             msg = "AI stunned!"
@@ -351,9 +466,9 @@ def main(stdscr):
 
         # Lose check
         if ai_pos == player_pos:
-            draw(stdscr, grid, player_pos, ai_pos, goal_pos, traps, traps_left, "Caught by AI. Game over.", turn)
+            draw(stdscr, render_buf, traps_left, "Caught by AI. Game over.", turn)
             curses.napms(900)
-            save_game(this_game_moves, "loss")
+            save_game(memory, this_game_moves, "loss")
             return
 
         turn += 1
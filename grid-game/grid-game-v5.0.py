@@ -1,8 +1,10 @@
 #!/usr/bin/env python3
 import curses
+import functools
 import random
 import json
 import os
+from array import array
 from collections import deque, defaultdict, Counter
 
 # ----------------------
@@ -13,11 +15,16 @@ NUM_OBSTACLES = 12
 NUM_TRAPS = 3
 AI_STUN_TURNS = 2
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-MEMORY_FILE = os.path.join(BASE_DIR, "ai_memory.json")
+MEMORY_FILE = os.path.join(BASE_DIR, "ai_memory.jsonl")
+LEGACY_MEMORY_FILE = os.path.join(BASE_DIR, "ai_memory.json")
+MODEL_FILE = os.path.join(BASE_DIR, "ai_model.json")
+MODEL_KEYS = ("model", "global", "model_order", "model_games")
 MARKOV_ORDER = 2
 RECENCY_WEIGHT = 2.0
 PREDICT_FUZZ = 0.15
 CLOSE_RANGE = 2
+DOUBLE_MOVE_RANGE = CLOSE_RANGE + 2  # AI A takes two steps when farther than this
+INPUT_POLL_MS = 16
 
 EMPTY = '.'
 WALL  = '#'
@@ -27,6 +34,15 @@ AI    = 'A'
 AI2   = 'B'
 TRAP  = 'T'
 
+# Tile bytes for the flat display grid and the overlay draw builds from it
+EMPTY_B = ord(EMPTY)
+WALL_B = ord(WALL)
+GOAL_B = ord(GOAL)
+PLAYER_B = ord(PLAYER)
+AI_B = ord(AI)
+AI2_B = ord(AI2)
+TRAP_B = ord(TRAP)
+
 DIRS = {
     "north": (-1, 0),
     "south": (1, 0),
@@ -41,134 +57,307 @@ DIR_KEYS = {
     curses.KEY_RIGHT: "east",
 }
 
+_DIR_NAMES = ("north", "south", "west", "east")  # DIRS order, as plain tuples
+_DIR_DELTAS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
 # ----------------------
-# MEMORY (JSON)
+# MEMORY (JSON lines, one game per line)
 # ----------------------
-def load_memory(path=MEMORY_FILE):
+def pack_game(game):
+    return json.dumps(game, separators=(",", ":")) + "\n"
+
+def import_legacy_memory(path, legacy_path=LEGACY_MEMORY_FILE):
+    """Copy the games of an old single-document ai_memory.json over once."""
+    try:
+        with open(legacy_path, "r") as f:
+            games = json.load(f).get("games", [])
+    except Exception:
+        return
+    with open(path, "w") as f:
+        f.writelines(pack_game(g) for g in games)
+
+def load_memory(path=MEMORY_FILE, model_path=MODEL_FILE):
     if not os.path.exists(path):
+        import_legacy_memory(path)
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+    except OSError:
         return {"games": []}
+    *lines, tail = raw.split(b"\n")
+    games = []
+    for line in lines:
+        try:
+            games.append(json.loads(line))
+        except ValueError:
+            continue  # blank or corrupt line
+    if tail:
+        # No newline after the last line, so the next save would be glued
+        # onto it. Keep it if it is a whole game; otherwise it is a save cut
+        # short and is cut off the file.
+        try:
+            games.append(json.loads(tail))
+            complete = True
+        except ValueError:
+            complete = False
+        try:
+            if complete:
+                with open(path, "ab") as f:
+                    f.write(b"\n")
+            else:
+                os.truncate(path, len(raw) - len(tail))
+        except OSError:
+            pass
+    memory = {"games": games}
     try:
-        with open(path, "r") as f:
-            return json.load(f)
+        with open(model_path, "r") as f:
+            memory.update(json.load(f))
     except Exception:
-        return {"games": []}
-
-def save_game(moves, result, path=MEMORY_FILE, successful_traps=0):
-    data = load_memory(path)
-    data["games"].append({
+        pass
+    return memory
+
+def save_game(memory, model, global_counts, moves, result, path=MEMORY_FILE, successful_traps=0, model_path=MODEL_FILE):
+    """
+    Append one game. memory is the dict main loaded at the start of the game
+    and model/global_counts the live model it got from load_markov_model;
+    all three are updated in place rather than read back or rebuilt.
+    """
+    game = {
         "moves": moves,
         "result": result,
         "grid": GRID_SIZE,
         "successful_traps": successful_traps
-    })
-    with open(path, "w") as f:
-        json.dump(data, f, indent=2)
+    }
+    memory["games"].append(game)
+    with open(path, "a") as f:
+        f.write(pack_game(game))
+    update_markov_model(model, global_counts, moves, MARKOV_ORDER)
+    store_markov_model(memory, model, global_counts, MARKOV_ORDER)
+    with open(model_path, "w") as f:
+        json.dump({k: memory[k] for k in MODEL_KEYS}, f, separators=(",", ":"))
+
+def update_markov_model(model, global_counts, seq, order=2):
+    global_counts.update(seq)
+    for i in range(len(seq)):
+        for k in range(1, order+1):
+            if i - k < 0: break
+            ctx = tuple(seq[i-k:i])
+            model[ctx][seq[i]] += 1
 
 def build_markov_model(memory, order=2):
     model = defaultdict(Counter)
     global_counts = Counter()
     for g in memory.get("games", []):
-        seq = g.get("moves", [])
-        global_counts.update(seq)
-        if not seq:
-            continue
-        for i in range(len(seq)):
-            for k in range(1, order+1):
-                if i - k < 0: break
-                ctx = tuple(seq[i-k:i])
-                model[ctx][seq[i]] += 1
+        update_markov_model(model, global_counts, g.get("moves", []), order)
+    return model, global_counts
+
+def store_markov_model(memory, model, global_counts, order=2):
+    """Save the model next to the games it was built from ("model_games" of them)."""
+    memory["model"] = {",".join(ctx): dict(nxt) for ctx, nxt in model.items()}
+    memory["global"] = dict(global_counts)
+    memory["model_order"] = order
+    memory["model_games"] = len(memory["games"])
+
+def load_markov_model(memory, order=2):
+    """
+    Read the stored model instead of replaying every game. Games saved after
+    it (e.g. by an older version that doesn't keep it) are folded in; it is
+    only rebuilt from scratch if missing or built for another order.
+    """
+    games = memory.get("games", [])
+    done = memory.get("model_games", 0)
+    if "model" not in memory or memory.get("model_order") != order or done > len(games):
+        return build_markov_model(memory, order)
+    model = defaultdict(Counter)
+    for key, nxt in memory["model"].items():
+        model[tuple(key.split(","))] = Counter(nxt)
+    global_counts = Counter(memory.get("global", {}))
+    for g in games[done:]:
+        update_markov_model(model, global_counts, g.get("moves", []), order)
     return model, global_counts
 
 # ----------------------
 # GRID + POSITIONS
 # ----------------------
-def random_empty_cell(grid):
-    n = len(grid)
-    while True:
-        r = random.randrange(n)
-        c = random.randrange(n)
-        if grid[r][c] == EMPTY:
-            return [r, c]
-
 def make_grid():
-    grid = [[EMPTY for _ in range(GRID_SIZE)] for _ in range(GRID_SIZE)]
+    """
+    Returns:
+      grid: flat bytearray of tile bytes, grid[r*GRID_SIZE + c], only used
+            for drawing
+      walls: flat bytes, walls[r*GRID_SIZE + c] is 1 for a wall, else 0
+             (immutable, so it doubles as the board's key in BFS caches)
+    """
+    grid = bytearray([EMPTY_B]) * (GRID_SIZE * GRID_SIZE)
+    walls = bytearray(GRID_SIZE * GRID_SIZE)
     placed = 0
     while placed < NUM_OBSTACLES:
         r = random.randrange(GRID_SIZE)
         c = random.randrange(GRID_SIZE)
-        if grid[r][c] == EMPTY:
-            grid[r][c] = WALL
+        idx = r * GRID_SIZE + c
+        if grid[idx] == EMPTY_B:
+            grid[idx] = WALL_B
+            walls[idx] = 1
             placed += 1
-    return grid
+    return grid, bytes(walls)
 
 def place_entities(grid):
-    player_pos = random_empty_cell(grid)
-    ai_pos     = random_empty_cell(grid)
-    ai2_pos    = random_empty_cell(grid)
-    goal_pos   = random_empty_cell(grid)
-    # Ensure no overlap
-    while (ai_pos == player_pos or ai2_pos == player_pos or
-           goal_pos == player_pos or goal_pos == ai_pos or
-           goal_pos == ai2_pos or ai_pos == ai2_pos):
-        ai_pos   = random_empty_cell(grid)
-        ai2_pos  = random_empty_cell(grid)
-        goal_pos = random_empty_cell(grid)
+    empties = [divmod(idx, GRID_SIZE) for idx, tile in enumerate(grid) if tile == EMPTY_B]
+    # Distinct by construction, no retries
+    player_pos, ai_pos, ai2_pos, goal_pos = random.sample(empties, 4)
     return player_pos, ai_pos, ai2_pos, goal_pos
 
 # ----------------------
 # PATHFINDING
 # ----------------------
-def neighbors(r, c, grid):
-    n = len(grid)
-    for dr, dc in DIRS.values():
-        nr, nc = r+dr, c+dc
-        if 0 <= nr < n and 0 <= nc < n and grid[nr][nc] != WALL:
-            yield nr, nc
-
-def bfs_first_step(start, target, grid):
+# The board's shape never changes, so each cell's in-bounds neighbours are
+# worked out once here: NEIGHBOR_INDICES[r*GRID_SIZE + c] holds their flat
+# indices, in _DIR_DELTAS order. Searches only have to check for walls.
+NEIGHBOR_INDICES = tuple(
+    tuple(r2 * GRID_SIZE + c2
+          for dr, dc in _DIR_DELTAS
+          for r2, c2 in [(r + dr, c + dc)]
+          if 0 <= r2 < GRID_SIZE and 0 <= c2 < GRID_SIZE)
+    for r in range(GRID_SIZE) for c in range(GRID_SIZE)
+)
+
+# Bitboard view of the board: bit r*GRID_SIZE + c stands for cell (r, c).
+# A set of cells is one int, so a BFS layer grows in a handful of shifts.
+# Shifting by one column wraps into the neighbouring row, which the column
+# masks cut off.
+ALL_CELLS = (1 << (GRID_SIZE * GRID_SIZE)) - 1
+FIRST_COL = sum(1 << (r * GRID_SIZE) for r in range(GRID_SIZE))
+NOT_FIRST_COL = ALL_CELLS ^ FIRST_COL
+NOT_LAST_COL = ALL_CELLS ^ (FIRST_COL << (GRID_SIZE - 1))
+
+def _spread(cells):
+    """Every cell next to one in cells (the cells themselves not included)."""
+    return (((cells << GRID_SIZE) | (cells >> GRID_SIZE)
+             | ((cells << 1) & NOT_FIRST_COL) | ((cells >> 1) & NOT_LAST_COL))
+            & ALL_CELLS)
+
+@functools.lru_cache(maxsize=8)
+def open_cells(walls):
+    """Bitboard of the non-wall cells of a board."""
+    bits = ALL_CELLS
+    for idx, w in enumerate(walls):
+        if w:
+            bits ^= 1 << idx
+    return bits
+
+def _clear_line(walls, start, target):
+    """
+    Walk from start toward target, always stepping along the axis with more
+    distance left. If no cell on the way is a wall that walk is a shortest
+    path, so its first step is returned; otherwise None.
+    """
+    r, c = start
+    tr, tc = target
+    first = None
+    while r != tr or c != tc:
+        dr, dc = tr - r, tc - c
+        if abs(dr) >= abs(dc):
+            r += 1 if dr > 0 else -1
+        else:
+            c += 1 if dc > 0 else -1
+        if walls[r * GRID_SIZE + c]:
+            return None
+        if first is None:
+            first = (r, c)
+    return first
+
+def bfs_first_step(start, target, walls):
     if start == target:
         return start
-    q = deque([start])
-    prev = {tuple(start): None}
-    n = len(grid)
+    step = _clear_line(walls, start, target)
+    if step is not None:
+        return step
+    # Grow the reachable set a layer at a time until it touches target,
+    # then walk back through the layers to the one next to start.
+    free = open_cells(walls)
+    target_bit = 1 << (target[0] * GRID_SIZE + target[1])
+    seen = 1 << (start[0] * GRID_SIZE + start[1])
+    frontier = seen
+    layers = []
+    while True:
+        frontier = _spread(frontier) & free & ~seen
+        if not frontier:
+            return None
+        if frontier & target_bit:
+            break
+        layers.append(frontier)
+        seen |= frontier
+    cell = target_bit
+    for layer in reversed(layers):
+        cell = _spread(cell) & layer
+        cell &= -cell  # keep the lowest-index choice
+    return divmod(cell.bit_length() - 1, GRID_SIZE)
+
+# Walls never change during a game (traps don't block movement), so BFS
+# answers are cached per board, keyed by the walls bytes themselves.
+@functools.lru_cache(maxsize=256)
+def bfs_first_step_cached(start, target, walls):
+    return bfs_first_step(start, target, walls)
+
+def compute_distance_field(walls, source):
+    """
+    One BFS outward from source. Returns a flat array('h') of path lengths
+    to source, indexed r*GRID_SIZE + c (-1 = wall or unreachable).
+    """
+    source_idx = source[0] * GRID_SIZE + source[1]
+    dist = array('h', [-1]) * (GRID_SIZE * GRID_SIZE)
+    dist[source_idx] = 0
+    q = deque([source_idx])
     while q:
-        r, c = q.popleft()
-        for nr, nc in neighbors(r, c, grid):
-            if (nr, nc) not in prev:
-                prev[(nr, nc)] = (r, c)
-                if [nr, nc] == target:
-                    cur = (nr, nc)
-                    while prev[cur] != tuple(start):
-                        cur = prev[cur]
-                    return [cur[0], cur[1]]
-                q.append((nr, nc))
+        idx = q.popleft()
+        for nidx in NEIGHBOR_INDICES[idx]:
+            if walls[nidx] == 0 and dist[nidx] == -1:
+                dist[nidx] = dist[idx] + 1
+                q.append(nidx)
+    return dist
+
+def _best_neighbor_by_field(pos, dist):
+    """
+    First step from pos on a shortest path to the field's source: any
+    neighbour one step closer. pos itself if already there, None if the
+    source can't be reached.
+    """
+    idx = pos[0] * GRID_SIZE + pos[1]
+    d = dist[idx]
+    if d <= 0:
+        return pos if d == 0 else None
+    for nidx in NEIGHBOR_INDICES[idx]:
+        if dist[nidx] == d - 1:
+            return divmod(nidx, GRID_SIZE)
     return None
 
 # ----------------------
 # AI LOGIC
 # ----------------------
-def ai_a_turn(ai_pos, player_pos, grid, traps, this_moves, model, global_counts, stunned, goal_pos, ai2_pos):
+def ai_a_turn(ai_pos, player_pos, walls, traps, this_moves, model, global_counts, stunned, dist_from_goal, ai2_pos):
     if stunned > 0:
         return ai_pos, stunned - 1
 
     moves = 1
-    if manhattan(ai_pos, player_pos) > CLOSE_RANGE + 2:
+    if manhattan(ai_pos, player_pos) > DOUBLE_MOVE_RANGE:
         moves = 2
 
     new_ai_pos = ai_pos
     stunned_left = 0
     for _ in range(moves):
-        path_step = bfs_first_step(player_pos, goal_pos, grid)
+        path_step = _best_neighbor_by_field(player_pos, dist_from_goal)
         intercept_target = path_step if path_step else player_pos
 
-        step = bfs_first_step(new_ai_pos, intercept_target, grid)
+        step = bfs_first_step_cached(new_ai_pos, intercept_target, walls)
         if step is None:
             best = new_ai_pos
             best_d = 10**9
-            for name, (dr, dc) in DIRS.items():
-                cand = [new_ai_pos[0] + dr, new_ai_pos[1] + dc]
-                if in_bounds(cand) and grid[cand[0]][cand[1]] != WALL and cand != ai2_pos:
-                    d = manhattan(cand, intercept_target)
+            r, c = new_ai_pos
+            tr, tc = intercept_target
+            for dr, dc in _DIR_DELTAS:
+                cr, cc = r + dr, c + dc
+                cand = (cr, cc)
+                if in_bounds(cand) and walls[cr * GRID_SIZE + cc] == 0 and cand != ai2_pos:
+                    d = abs(cr - tr) + abs(cc - tc)
                     if d < best_d:
                         best_d = d
                         best = cand
@@ -177,8 +366,8 @@ def ai_a_turn(ai_pos, player_pos, grid, traps, this_moves, model, global_counts,
         if step == ai2_pos:
             break
 
-        if tuple(step) in traps:
-            traps.remove(tuple(step))
+        if step in traps:
+            traps.remove(step)
             stunned_left = AI_STUN_TURNS
             new_ai_pos = step
             break
@@ -186,7 +375,20 @@ def ai_a_turn(ai_pos, player_pos, grid, traps, this_moves, model, global_counts,
 
     return new_ai_pos, stunned_left
 
-def ai_b_turn(ai2_pos, player_pos, grid, traps, stunned, ai_pos, goal_pos, ai2_mode, ai2_chase_count):
+def precompute_next_ai_moves(ai_pos, player_pos, walls, dist_from_goal):
+    """
+    Idle-time lookahead while waiting for a key: for every cell the player
+    could be on next turn (any move, or staying put), run the BFS queries
+    ai_a_turn will make so the real turn finds them in the cache.
+    """
+    for player_next in {player_pos, *(try_move(player_pos, m, walls) for m in _DIR_NAMES)}:
+        path_step = _best_neighbor_by_field(player_next, dist_from_goal)
+        intercept_target = path_step if path_step else player_next
+        step = bfs_first_step_cached(ai_pos, intercept_target, walls)
+        if step is not None:
+            bfs_first_step_cached(step, intercept_target, walls)
+
+def ai_b_turn(ai2_pos, player_pos, walls, traps, stunned, ai_pos, goal_pos, ai2_mode, ai2_chase_count):
     if stunned > 0:
         return ai2_pos, stunned - 1, ai2_mode, ai2_chase_count
 
@@ -206,25 +408,29 @@ def ai_b_turn(ai2_pos, player_pos, grid, traps, stunned, ai_pos, goal_pos, ai2_m
         # Chase player
         best = ai2_pos
         best_d = manhattan(ai2_pos, player_pos)
-        for name, (dr, dc) in DIRS.items():
-            cand = [ai2_pos[0] + dr, ai2_pos[1] + dc]
-            if in_bounds(cand) and grid[cand[0]][cand[1]] != WALL and cand != ai_pos:
-                d = manhattan(cand, player_pos)
+        r, c = ai2_pos
+        pr, pc = player_pos
+        for dr, dc in _DIR_DELTAS:
+            cr, cc = r + dr, c + dc
+            cand = (cr, cc)
+            if in_bounds(cand) and walls[cr * GRID_SIZE + cc] == 0 and cand != ai_pos:
+                d = abs(cr - pr) + abs(cc - pc)
                 if d < best_d:
                     best_d = d
                     best = cand
         if best == ai_pos:
             return ai2_pos, 0, ai2_mode, ai2_chase_count
-        if tuple(best) in traps:
-            traps.remove(tuple(best))
+        if best in traps:
+            traps.remove(best)
             return best, AI_STUN_TURNS, ai2_mode, ai2_chase_count
         return best, 0, ai2_mode, ai2_chase_count
     else:
         # Guard: move to a random adjacent cell around the goal
         adj_cells = []
-        for dr, dc in DIRS.values():
-            cand = [goal_pos[0] + dr, goal_pos[1] + dc]
-            if in_bounds(cand) and grid[cand[0]][cand[1]] != WALL and cand != ai_pos and cand != ai2_pos:
+        r, c = goal_pos
+        for dr, dc in _DIR_DELTAS:
+            cand = (r + dr, c + dc)
+            if in_bounds(cand) and walls[cand[0] * GRID_SIZE + cand[1]] == 0 and cand != ai_pos and cand != ai2_pos:
                 adj_cells.append(cand)
         # If already adjacent, move to another adjacent cell if possible
         if adj_cells:
@@ -236,8 +442,8 @@ def ai_b_turn(ai2_pos, player_pos, grid, traps, stunned, ai_pos, goal_pos, ai2_m
                 next_pos = ai2_pos
         else:
             next_pos = ai2_pos
-        if tuple(next_pos) in traps:
-            traps.remove(tuple(next_pos))
+        if next_pos in traps:
+            traps.remove(next_pos)
             return next_pos, AI_STUN_TURNS, ai2_mode, ai2_chase_count
         return next_pos, 0, ai2_mode, ai2_chase_count
 
@@ -245,70 +451,91 @@ def ai_b_turn(ai2_pos, player_pos, grid, traps, stunned, ai_pos, goal_pos, ai2_m
 # AI PREDICTION (for stats/learning)
 # ----------------------
 def choose_from_counter(counter_dict):
-    items = list(counter_dict.items())
-    if not items:
-        return random.choice(list(DIRS.keys()))
-    total = sum(v for _, v in items)
-    r = random.random() * total
-    acc = 0
-    for k, v in items:
-        acc += v
-        if r <= acc:
-            return k
-    return items[-1][0]
+    if not counter_dict:
+        return random.choice(_DIR_NAMES)
+    keys = list(counter_dict)
+    weights = list(counter_dict.values())
+    return random.choices(keys, weights=weights, k=1)[0]
+
+# Scores for predict_next_move, zeroed and refilled on each call rather than
+# building new Counters every prediction.
+_PRED_BUF = dict.fromkeys(_DIR_NAMES, 0.0)
 
 def predict_next_move(this_game_moves, model, global_counts, order=2):
-    combined = Counter()
+    combined = _PRED_BUF
+    for m in combined:
+        combined[m] = 0.0
     for k in reversed(range(1, order+1)):
         if len(this_game_moves) >= k:
-            ctx = tuple(this_game_moves[-k:])
-            combined.update(model.get(ctx, Counter()))
-    game_counts = Counter(this_game_moves[-8:])
-    for m in DIRS.keys():
-        combined[m] += 0.50 * global_counts.get(m, 0) + RECENCY_WEIGHT * game_counts.get(m, 0)
-    for m in DIRS.keys():
-        combined[m] += PREDICT_FUZZ
+            counts = model.get(tuple(this_game_moves[-k:]))
+            if counts:
+                for m, cnt in counts.items():
+                    combined[m] += cnt
+    for m in this_game_moves[-8:]:
+        combined[m] += RECENCY_WEIGHT
+    for m in _DIR_NAMES:
+        combined[m] += 0.50 * global_counts.get(m, 0) + PREDICT_FUZZ
     return choose_from_counter(combined)
 
 # ----------------------
 # GAME LOOP (CURSES)
 # ----------------------
+# What the screen currently shows, so draw only writes what changed.
+# cells is None until the first frame of a game has been drawn.
+_FRAME = {"cells": None, "status": None, "msg": ""}
+
+def new_frame():
+    _FRAME.update(cells=None, status=None, msg="")
+
+def draw_message(stdscr, msg):
+    """Rewrite just the message row below the board."""
+    if msg != _FRAME["msg"]:
+        _FRAME["msg"] = msg
+        row = 3 + GRID_SIZE + 1
+        stdscr.move(row, 0)
+        stdscr.clrtoeol()
+        if msg:
+            stdscr.addstr(row, 0, msg[:curses.COLS - 1])
+
 def draw(stdscr, grid, player_pos, ai_pos, ai2_pos, goal_pos, traps, traps_left, msg, turn):
-    stdscr.clear()
-    n = len(grid)
+    n = GRID_SIZE
     max_x = curses.COLS - 1
-    header = "AI NEMESIS — reach G, avoid A/B | arrows: move | t: trap | q: quit"
-    stdscr.addstr(0, 0, header[:max_x])
-    stdscr.addstr(1, 0, f"Traps left: {traps_left}   Turn: {turn}"[:max_x])
-    for r in range(n):
-        line = []
-        for c in range(n):
-            ch = grid[r][c]
-            if player_pos == [r, c]:
-                ch = PLAYER
-            elif ai_pos == [r, c]:
-                ch = AI
-            elif ai2_pos == [r, c]:
-                ch = AI2
-            elif goal_pos == [r, c]:
-                ch = GOAL
-            elif (r, c) in traps:
-                ch = TRAP
-            line.append(ch)
-        line_str = " ".join(line)
-        stdscr.addstr(3 + r, 0, line_str[:max_x])
-    if msg:
-        stdscr.addstr(3 + n + 1, 0, msg[:max_x])
+    shown = _FRAME["cells"]
+    if shown is None:
+        stdscr.erase()
+        header = "AI NEMESIS — reach G, avoid A/B | arrows: move | t: trap | q: quit"
+        stdscr.addstr(0, 0, header[:max_x])
+        shown = _FRAME["cells"] = bytearray(n * n)  # matches no tile
+    status = f"Traps left: {traps_left}   Turn: {turn}"
+    if status != _FRAME["status"]:
+        _FRAME["status"] = status
+        stdscr.addstr(1, 0, status[:max_x])
+        stdscr.clrtoeol()
+    # Overlay the pieces on a copy of the tiles, lowest priority first
+    cells = bytearray(grid)
+    for r, c in traps:
+        cells[r * n + c] = TRAP_B
+    for pos, tile in ((goal_pos, GOAL_B), (ai2_pos, AI2_B), (ai_pos, AI_B), (player_pos, PLAYER_B)):
+        cells[pos[0] * n + pos[1]] = tile
+    if cells != shown:
+        for idx, tile in enumerate(cells):
+            if shown[idx] != tile:
+                shown[idx] = tile
+                r, c = divmod(idx, n)
+                if 2 * c < max_x:
+                    stdscr.addstr(3 + r, 2 * c, chr(tile))
+    draw_message(stdscr, msg)
     stdscr.refresh()
 
 def in_bounds(pos):
-    return 0 <= pos[0] < GRID_SIZE and 0 <= pos[1] < GRID_SIZE
+    # (a | b) >= 0 only when both are non-negative
+    return (pos[0] | pos[1]) >= 0 and pos[0] < GRID_SIZE and pos[1] < GRID_SIZE
 
-def try_move(pos, move_label, grid):
+def try_move(pos, move_label, walls):
     dr, dc = DIRS[move_label]
     nr, nc = pos[0] + dr, pos[1] + dc
-    if 0 <= nr < GRID_SIZE and 0 <= nc < GRID_SIZE and grid[nr][nc] != WALL:
-        return [nr, nc]
+    if 0 <= nr < GRID_SIZE and 0 <= nc < GRID_SIZE and walls[nr * GRID_SIZE + nc] == 0:
+        return (nr, nc)
     return pos
 
 def manhattan(a, b):
@@ -316,14 +543,16 @@ def manhattan(a, b):
 
 def main(stdscr):
     curses.curs_set(0)
-    stdscr.nodelay(False)
+    stdscr.timeout(INPUT_POLL_MS)  # poll for keys so idle time can run lookahead
     stdscr.keypad(True)
 
     memory = load_memory()
-    model, global_counts = build_markov_model(memory, MARKOV_ORDER)
+    model, global_counts = load_markov_model(memory, MARKOV_ORDER)
 
-    grid = make_grid()
+    grid, walls = make_grid()
     player_pos, ai_pos, ai2_pos, goal_pos = place_entities(grid)
+    # walls are fixed for the game, so one BFS from the goal serves every turn
+    dist_from_goal = compute_distance_field(walls, goal_pos)
     traps = set()
     traps_left = NUM_TRAPS
     this_game_moves = []
@@ -334,26 +563,33 @@ def main(stdscr):
     msg = ""
     turn = 1
     successful_traps = 0
+    new_frame()
 
     while True:
         draw(stdscr, grid, player_pos, ai_pos, ai2_pos, goal_pos, traps, traps_left, msg, turn)
         msg = ""
 
         ch = stdscr.getch()
+        looked_ahead = False
+        while ch == -1:
+            if not looked_ahead and ai_stunned == 0:
+                precompute_next_ai_moves(ai_pos, player_pos, walls, dist_from_goal)
+                looked_ahead = True
+            ch = stdscr.getch()
         if ch == ord('q'):
-            save_game(this_game_moves, "quit", successful_traps=successful_traps)
+            save_game(memory, model, global_counts, this_game_moves, "quit", successful_traps=successful_traps)
             return
 
         if ch == ord('t'):
-            if traps_left > 0 and tuple(player_pos) not in traps:
-                traps.add(tuple(player_pos))
+            if traps_left > 0 and player_pos not in traps:
+                traps.add(player_pos)
                 traps_left -= 1
                 msg = "Trap placed."
             else:
                 msg = "No traps left or trap already here."
         elif ch in DIR_KEYS:
             move_label = DIR_KEYS[ch]
-            new_pos = try_move(player_pos, move_label, grid)
+            new_pos = try_move(player_pos, move_label, walls)
             if new_pos != player_pos:
                 player_pos = new_pos
                 this_game_moves.append(move_label)
@@ -365,18 +601,18 @@ def main(stdscr):
         if player_pos == goal_pos:
             draw(stdscr, grid, player_pos, ai_pos, ai2_pos, goal_pos, traps, traps_left, "You reached the goal! You win.", turn)
             curses.napms(900)
-            save_game(this_game_moves, "win", successful_traps=successful_traps)
+            save_game(memory, model, global_counts, this_game_moves, "win", successful_traps=successful_traps)
             return
 
         prev_ai_stunned = ai_stunned
-        ai_pos, ai_stunned = ai_a_turn(ai_pos, player_pos, grid, traps, this_game_moves, model, global_counts, ai_stunned, goal_pos, ai2_pos)
+        ai_pos, ai_stunned = ai_a_turn(ai_pos, player_pos, walls, traps, this_game_moves, model, global_counts, ai_stunned, dist_from_goal, ai2_pos)
         if ai_stunned > 0 and prev_ai_stunned == 0:
             msg = "AI A stunned!"
             successful_traps += 1
 
         prev_ai2_stunned = ai2_stunned
         ai2_pos, ai2_stunned, ai2_mode, ai2_chase_count = ai_b_turn(
-            ai2_pos, player_pos, grid, traps, ai2_stunned, ai_pos, goal_pos, ai2_mode, ai2_chase_count
+            ai2_pos, player_pos, walls, traps, ai2_stunned, ai_pos, goal_pos, ai2_mode, ai2_chase_count
         )
         if ai2_stunned > 0 and prev_ai2_stunned == 0:
             msg = "AI B stunned!"
@@ -385,7 +621,7 @@ def main(stdscr):
         if ai_pos == player_pos or ai2_pos == player_pos:
             draw(stdscr, grid, player_pos, ai_pos, ai2_pos, goal_pos, traps, traps_left, "Caught by AI. Game over.", turn)
             curses.napms(900)
-            save_game(this_game_moves, "loss", successful_traps=successful_traps)
+            save_game(memory, model, global_counts, this_game_moves, "loss", successful_traps=successful_traps)
             return
 
         turn += 1
@@ -412,12 +648,16 @@ def show_stats(stdscr):
     memory = load_memory()
     games = memory.get("games", [])
     total = len(games)
-    wins = sum(1 for g in games if g.get("result") == "win")
-    losses = sum(1 for g in games if g.get("result") == "loss")
-    quits = sum(1 for g in games if g.get("result") == "quit")
+    results = Counter()
+    total_moves = 0
+    total_traps = 0
+    for g in games:
+        results[g.get("result")] += 1
+        total_moves += len(g.get("moves", ()))
+        total_traps += g.get("successful_traps", 0)
+    wins, losses, quits = results["win"], results["loss"], results["quit"]
     win_rate = (wins / total * 100) if total else 0
-    avg_moves = (sum(len(g.get("moves", [])) for g in games) / total) if total else 0
-    total_traps = sum(g.get("successful_traps", 0) for g in games)
+    avg_moves = (total_moves / total) if total else 0
     avg_traps = (total_traps / total) if total else 0
     stdscr.clear()
     stdscr.addstr(0, 0, "AI NEMESIS — Statistics")
@@ -438,6 +678,7 @@ def main_menu(stdscr):
         choice = show_menu(stdscr)
         if choice == 0:
             main(stdscr)
+            stdscr.timeout(-1)  # back to blocking input for the menus
         elif choice == 1:
             show_stats(stdscr)
         elif choice == 2: